@@ -3,18 +3,28 @@ FastAPI application for the LLM-powered workout tracker.
 Provides REST API endpoints for logging workouts and getting AI-powered suggestions.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import Optional, List, Dict
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 import uvicorn
+import asyncio
+import orjson
 import os
 
-from db import init_database, log_workout, get_recent_workouts, get_all_workouts
-from llm import get_workout_suggestion
+from db import (
+    init_database,
+    log_workout,
+    log_workouts_bulk,
+    get_recent_workouts,
+    get_workouts_page,
+    get_weekly_summary,
+    get_workout_stats,
+)
+from llm import get_workout_suggestion, stream_workout_suggestion
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -30,6 +40,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Pydantic models for request/response validation
@@ -56,6 +67,68 @@ class WorkoutResponse(BaseModel):
     duration: Optional[int] = None
     date: str
 
+# Validates and dumps a whole list of workout rows in one call
+WorkoutListAdapter = TypeAdapter(List[WorkoutResponse])
+
+def _dump_workouts(workouts: List[Dict],
+                   next_cursor: Optional[str]) -> Tuple[List[Dict], Optional[Dict[str, str]]]:
+    """
+    Validate a list of workout rows and build the pagination headers shared by both list formats.
+    
+    Args:
+        workouts: Workout dictionaries from the database
+        next_cursor: Cursor for the next page, sent as the X-Next-Cursor header
+    
+    Returns:
+        Tuple of (validated workout dictionaries, response headers or None)
+    """
+    content = WorkoutListAdapter.dump_python(WorkoutListAdapter.validate_python(workouts))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return content, headers
+
+def workout_list_response(workouts: List[Dict], next_cursor: Optional[str] = None) -> Response:
+    """
+    Build an orjson-encoded response for a list of workout rows.
+    
+    Args:
+        workouts: Workout dictionaries from the database
+        next_cursor: Cursor for the next page, sent as the X-Next-Cursor header
+    
+    Returns:
+        JSON response with the validated workouts
+    """
+    content, headers = _dump_workouts(workouts, next_cursor)
+    return Response(orjson.dumps(content), media_type="application/json", headers=headers)
+
+# Largest page a workout list endpoint will return
+MAX_PAGE_SIZE = 500
+
+# Media type for newline-delimited JSON, one workout per line
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def workout_ndjson_response(workouts: List[Dict], next_cursor: Optional[str] = None) -> Response:
+    """
+    Build a newline-delimited JSON response for a list of workout rows,
+    with one JSON object per line.
+    
+    Args:
+        workouts: Workout dictionaries from the database
+        next_cursor: Cursor for the next page, sent as the X-Next-Cursor header
+    
+    Returns:
+        NDJSON response with the validated workouts
+    """
+    content, headers = _dump_workouts(workouts, next_cursor)
+    body = b"".join(orjson.dumps(workout) + b"\n" for workout in content)
+    return Response(body, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+class WeeklySummaryResponse(BaseModel):
+    """Model for per-week workout summaries."""
+    week: str  # YYYY-WW
+    first_workout_date: str
+    workout_count: int
+    total_duration_minutes: int
+
 class SuggestionResponse(BaseModel):
     """Model for workout suggestion responses."""
     suggestion: str
@@ -63,48 +136,12 @@ class SuggestionResponse(BaseModel):
     generated_at: str
     workout_history_count: int
 
-# Mount static files for frontend
-if os.path.exists("frontend"):
-    app.mount("/static", StaticFiles(directory="frontend"), name="static")
-
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize the database when the app starts."""
     init_database()
 
-# Serve frontend
-@app.get("/")
-async def serve_frontend():
-    """Serve the frontend application."""
-    if os.path.exists("frontend/index.html"):
-        return FileResponse("frontend/index.html")
-    else:
-        return {
-            "message": "LLM-Powered Workout Tracker API",
-            "status": "healthy",
-            "version": "1.0.0",
-            "note": "Frontend not found. Please ensure frontend files are in the 'frontend' directory."
-        }
-
-# Serve CSS file
-@app.get("/styles.css")
-async def serve_css():
-    """Serve the CSS file."""
-    if os.path.exists("frontend/styles.css"):
-        return FileResponse("frontend/styles.css", media_type="text/css")
-    else:
-        raise HTTPException(status_code=404, detail="CSS file not found")
-
-# Serve JavaScript file
-@app.get("/script.js")
-async def serve_js():
-    """Serve the JavaScript file."""
-    if os.path.exists("frontend/script.js"):
-        return FileResponse("frontend/script.js", media_type="application/javascript")
-    else:
-        raise HTTPException(status_code=404, detail="JavaScript file not found")
-
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -146,6 +183,35 @@ async def log_workout_endpoint(workout: WorkoutLog):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error logging workout: {str(e)}")
 
+# Log multiple workouts endpoint
+@app.post("/log_workouts_bulk")
+async def log_workouts_bulk_endpoint(workouts: List[WorkoutLog]):
+    """
+    Log several workouts to the database in one transaction.
+    
+    Args:
+        workouts: List of workouts to log
+    
+    Returns:
+        Success message with the number of workouts logged
+    """
+    try:
+        success = log_workouts_bulk([
+            (w.exercise_name, w.sets, w.reps, w.weight, w.duration, w.date)
+            for w in workouts
+        ])
+        
+        if success:
+            return {
+                "message": "Workouts logged successfully",
+                "count": len(workouts)
+            }
+        else:
+            raise HTTPException(status_code=500, detail="Failed to log workouts")
+            
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error logging workouts: {str(e)}")
+
 # Get workout suggestions endpoint
 @app.post("/get_suggestions", response_model=SuggestionResponse)
 async def get_workout_suggestions(request: WorkoutSuggestionRequest):
@@ -160,10 +226,10 @@ async def get_workout_suggestions(request: WorkoutSuggestionRequest):
     """
     try:
         # Get recent workout history for context
-        recent_workouts = get_recent_workouts(limit=5)
+        recent_workouts = await asyncio.to_thread(get_recent_workouts, 5)
         
         # Generate workout suggestion using LangChain
-        suggestion = get_workout_suggestion(
+        suggestion = await get_workout_suggestion(
             fitness_goal=request.fitness_goal,
             user_id=request.user_id
         )
@@ -178,42 +244,93 @@ async def get_workout_suggestions(request: WorkoutSuggestionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating suggestion: {str(e)}")
 
+# Stream workout suggestions endpoint
+@app.post("/get_suggestions/stream")
+async def stream_workout_suggestions(request: WorkoutSuggestionRequest):
+    """
+    Stream AI-powered workout suggestions as Server-Sent Events.
+    
+    Each chunk is sent as a `data: {"token": ...}` event, followed by a final
+    `done` event carrying the same metadata as /get_suggestions.
+    
+    Args:
+        request: Request containing fitness goal and user ID
+    
+    Returns:
+        Streaming response with the suggestion tokens
+    """
+    async def event_stream():
+        recent_workouts = await asyncio.to_thread(get_recent_workouts, 5)
+        
+        async for token in stream_workout_suggestion(
+            fitness_goal=request.fitness_goal,
+            user_id=request.user_id
+        ):
+            yield b"data: " + orjson.dumps({"token": token}) + b"\n\n"
+        
+        done = {
+            "fitness_goal": request.fitness_goal,
+            "generated_at": datetime.now().isoformat(),
+            "workout_history_count": len(recent_workouts)
+        }
+        yield b"event: done\ndata: " + orjson.dumps(done) + b"\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 # Get recent workouts endpoint
 @app.get("/workouts/recent", response_model=List[WorkoutResponse])
-async def get_recent_workouts_endpoint(limit: int = 5):
+async def get_recent_workouts_endpoint(limit: int = Query(5, ge=1, le=MAX_PAGE_SIZE),
+                                       cursor: Optional[str] = None,
+                                       accept: Optional[str] = Header(None)):
     """
     Get recent workouts from the database.
     
     Args:
-        limit: Number of recent workouts to fetch (default: 5)
+        limit: Number of recent workouts to fetch (default: 5, max: MAX_PAGE_SIZE)
+        cursor: Cursor from a previous page's X-Next-Cursor header
+        accept: Send "application/x-ndjson" to receive one workout per line
     
     Returns:
         List of recent workouts
     """
     try:
-        workouts = get_recent_workouts(limit=limit)
-        return [WorkoutResponse(**workout) for workout in workouts]
+        workouts, next_cursor = get_workouts_page(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        if accept and NDJSON_MEDIA_TYPE in accept:
+            return workout_ndjson_response(workouts, next_cursor)
+        return workout_list_response(workouts, next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching workouts: {str(e)}")
 
 # Get all workouts endpoint
 @app.get("/workouts/all", response_model=List[WorkoutResponse])
-async def get_all_workouts_endpoint():
+async def get_all_workouts_endpoint(limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
     """
-    Get all workouts from the database.
+    Get all workouts from the database, one page at a time.
+    
+    Args:
+        limit: Page size (default: 100, max: MAX_PAGE_SIZE)
+        cursor: Cursor from a previous page's X-Next-Cursor header
     
     Returns:
-        List of all workouts
+        List of workouts for the requested page
     """
     try:
-        workouts = get_all_workouts()
-        return [WorkoutResponse(**workout) for workout in workouts]
+        workouts, next_cursor = get_workouts_page(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        return workout_list_response(workouts, next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching all workouts: {str(e)}")
 
 # Get workout statistics endpoint
 @app.get("/workouts/stats")
-async def get_workout_stats():
+async def get_workout_stats_endpoint():
     """
     Get basic workout statistics.
     
@@ -221,42 +338,67 @@ async def get_workout_stats():
         Dictionary with workout statistics
     """
     try:
-        all_workouts = get_all_workouts()
+        stats = get_workout_stats()
         
-        if not all_workouts:
+        if not stats["total_workouts"]:
             return {
                 "total_workouts": 0,
                 "unique_exercises": 0,
                 "message": "No workouts found"
             }
         
-        # Calculate statistics
-        total_workouts = len(all_workouts)
-        unique_exercises = len(set(workout["exercise_name"] for workout in all_workouts))
-        
-        # Get most recent workout date
-        most_recent_date = max(workout["date"] for workout in all_workouts)
-        
-        # Calculate total duration if available
-        total_duration = sum(workout["duration"] for workout in all_workouts if workout["duration"])
-        
         return {
-            "total_workouts": total_workouts,
-            "unique_exercises": unique_exercises,
-            "most_recent_workout": most_recent_date,
-            "total_duration_minutes": total_duration,
-            "average_workouts_per_week": round(total_workouts / max(1, len(set(workout["date"] for workout in all_workouts))), 2)
+            "total_workouts": stats["total_workouts"],
+            "unique_exercises": stats["unique_exercises"],
+            "most_recent_workout": stats["most_recent_workout"],
+            "total_duration_minutes": stats["total_duration_minutes"],
+            "average_workouts_per_week": round(stats["total_workouts"] / max(1, stats["workout_days"]), 2)
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating stats: {str(e)}")
 
+# Get weekly workout summary endpoint
+@app.get("/workouts/weekly", response_model=List[WeeklySummaryResponse])
+async def get_weekly_summary_endpoint(start: str, end: str):
+    """
+    Get per-week workout totals within a date range.
+    
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format
+    
+    Returns:
+        List of weekly summaries
+    """
+    try:
+        return get_weekly_summary(start, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching weekly summary: {str(e)}")
+
+class RevalidatingStaticFiles(StaticFiles):
+    """Static files that browsers revalidate with ETag/If-None-Match instead of re-downloading."""
+    
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", "no-cache")
+        return response
+
+# Serve the frontend (index.html, styles.css, script.js); mounted after the API
+# routes so it doesn't shadow them
+if os.path.exists("frontend"):
+    app.mount("/", RevalidatingStaticFiles(directory="frontend", html=True), name="frontend")
+
 if __name__ == "__main__":
-    # Run the application
+    from importlib.util import find_spec
+    
+    # Run the application (uvloop isn't available on Windows; fall back to asyncio there)
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,  # Enable auto-reload for development
+        loop="uvloop" if find_spec("uvloop") else "auto",
+        http="httptools",
+        reload=os.getenv("ENV") == "development",  # Auto-reload only in development
         log_level="info"
     )
@@ -5,38 +5,160 @@ Handles SQLite operations for storing and retrieving workout data.
 
 import sqlite3
 import json
-from datetime import datetime
-from typing import List, Dict, Optional
+import base64
+import queue
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
 import os
 
 # Database file path
 DB_PATH = "workouts.db"
 
+# Marker file recording that the current schema has been applied
+_SCHEMA_READY = DB_PATH + ".schema_ok"
+
+# Bump when the DDL in init_database changes so existing databases are migrated
+SCHEMA_VERSION = "1"
+
+# Maximum number of idle connections kept in the pool
+POOL_SIZE = 8
+
+# Pool of reusable SQLite connections
+_pool = queue.Queue(maxsize=POOL_SIZE)
+
+# SQL statements (kept constant so each connection's statement cache is reused)
+# A NULL date falls back to today's date, computed by SQLite
+INSERT_WORKOUT_SQL = '''
+    INSERT INTO workouts (exercise_name, sets, reps, weight, duration, date)
+    VALUES (?, ?, ?, ?, ?, COALESCE(?, DATE('now', 'localtime')))
+'''
+
+SELECT_FIRST_PAGE_SQL = '''
+    SELECT id, exercise_name, sets, reps, weight, duration, date, created_at
+    FROM workouts
+    ORDER BY date DESC, created_at DESC, id DESC
+    LIMIT ?
+'''
+
+SELECT_NEXT_PAGE_SQL = '''
+    SELECT id, exercise_name, sets, reps, weight, duration, date, created_at
+    FROM workouts
+    WHERE (date, created_at, id) < (?, ?, ?)
+    ORDER BY date DESC, created_at DESC, id DESC
+    LIMIT ?
+'''
+
+SELECT_DATE_RANGE_SQL = '''
+    SELECT exercise_name, sets, reps, weight, duration, date
+    FROM workouts
+    WHERE date BETWEEN ? AND ?
+    ORDER BY date DESC, created_at DESC
+'''
+
+SELECT_ALL_SQL = '''
+    SELECT exercise_name, sets, reps, weight, duration, date
+    FROM workouts
+    ORDER BY date DESC, created_at DESC
+'''
+
+SELECT_WEEKLY_SUMMARY_SQL = '''
+    SELECT strftime('%Y-%W', date) AS week, MIN(date) AS first_workout_date,
+           COUNT(*) AS workout_count, COALESCE(SUM(duration), 0) AS total_duration_minutes
+    FROM workouts
+    WHERE date BETWEEN ? AND ?
+      AND strftime('%Y-%W', date) IS NOT NULL  -- skip dates SQLite can't parse
+    GROUP BY week
+    ORDER BY week
+'''
+
+SELECT_STATS_SQL = '''
+    SELECT COUNT(*), COUNT(DISTINCT exercise_name), MAX(date),
+           COALESCE(SUM(duration), 0), COUNT(DISTINCT date)
+    FROM workouts
+'''
+
+def _connect() -> sqlite3.Connection:
+    """
+    Open a new SQLite connection configured for pooled, concurrent use.
+    """
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+@contextmanager
+def _get_conn():
+    """
+    Check a connection out of the pool, returning it when the block exits.
+    """
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
 def init_database():
     """
     Initialize the SQLite database and create the workouts table if it doesn't exist.
+    Skips the DDL when the schema marker is current, so extra workers start faster.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Create workouts table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS workouts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            exercise_name TEXT NOT NULL,
-            sets INTEGER,
-            reps INTEGER,
-            weight REAL,
-            duration INTEGER,  -- in minutes
-            date TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    if _schema_is_ready():
+        return
+    
+    with _get_conn() as conn:
+        cursor = conn.cursor()
+        
+        # Create workouts table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS workouts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                exercise_name TEXT NOT NULL,
+                sets INTEGER,
+                reps INTEGER,
+                weight REAL,
+                duration INTEGER,  -- in minutes
+                date TEXT NOT NULL DEFAULT (DATE('now', 'localtime')),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Index the date column for MAX(date) and date-ordered queries
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_date ON workouts(date)')
+        
+        # Composite index matching the keyset pagination order
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workouts_date_created
+            ON workouts(date DESC, created_at DESC, id DESC)
+        ''')
+    
+    with open(_SCHEMA_READY, "w") as f:
+        f.write(SCHEMA_VERSION)
+    
     print("Database initialized successfully!")
 
+def _schema_is_ready() -> bool:
+    """
+    Check whether the schema marker exists, matches SCHEMA_VERSION and is newer than the database.
+    """
+    try:
+        if os.path.getmtime(_SCHEMA_READY) <= os.path.getmtime(DB_PATH):
+            return False
+        with open(_SCHEMA_READY) as f:
+            return f.read().strip() == SCHEMA_VERSION
+    except OSError:
+        return False
+
 def log_workout(exercise_name: str, sets: Optional[int] = None, 
                 reps: Optional[int] = None, weight: Optional[float] = None, 
                 duration: Optional[int] = None, date: Optional[str] = None) -> bool:
@@ -54,63 +176,111 @@ def log_workout(exercise_name: str, sets: Optional[int] = None,
     Returns:
         bool: True if successful, False otherwise
     """
-    if date is None:
-        date = datetime.now().strftime("%Y-%m-%d")
+    return log_workouts_bulk([(exercise_name, sets, reps, weight, duration, date)])
+
+def log_workouts_bulk(rows: List[Tuple]) -> bool:
+    """
+    Log several workouts in a single transaction.
+    
+    Args:
+        rows: Tuples of (exercise_name, sets, reps, weight, duration, date);
+              a date of None defaults to today
     
+    Returns:
+        bool: True if successful, False otherwise
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO workouts (exercise_name, sets, reps, weight, duration, date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (exercise_name, sets, reps, weight, duration, date))
-        
-        conn.commit()
-        conn.close()
+        with _get_conn() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(INSERT_WORKOUT_SQL, rows)
+            conn.execute("COMMIT")
         return True
     except Exception as e:
-        print(f"Error logging workout: {e}")
+        print(f"Error logging workouts: {e}")
         return False
 
-def get_recent_workouts(limit: int = 5) -> List[Dict]:
+def encode_cursor(date: str, created_at: str, workout_id: int) -> str:
     """
-    Fetch the most recent workouts from the database.
+    Serialize a keyset position into an opaque, URL-safe cursor string.
     
     Args:
-        limit: Number of recent workouts to fetch (default: 5)
+        date: Date of the last workout on the page
+        created_at: Creation timestamp of the last workout on the page
+        workout_id: Row id of the last workout on the page
     
     Returns:
-        List of workout dictionaries
+        Base64-encoded cursor
+    """
+    raw = json.dumps([date, created_at, workout_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, str, int]:
+    """
+    Parse a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Base64-encoded cursor
+    
+    Returns:
+        Tuple of (date, created_at, workout_id)
+    
+    Raises:
+        ValueError: If the cursor is malformed
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT exercise_name, sets, reps, weight, duration, date
-            FROM workouts
-            ORDER BY date DESC, created_at DESC
-            LIMIT ?
-        ''', (limit,))
+        date, created_at, workout_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(date), str(created_at), int(workout_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def get_workouts_page(limit: int = 5, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch one page of workouts, newest first, using keyset pagination.
+    
+    Args:
+        limit: Maximum number of workouts to return (must be at least 1)
+        cursor: Cursor returned by a previous call (None for the first page)
+    
+    Returns:
+        Tuple of (list of workout dictionaries, cursor for the next page or None);
+        each dictionary also carries the row's id and created_at
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    position = decode_cursor(cursor) if cursor else None
+    
+    try:
+        with _get_conn() as conn:
+            if position is None:
+                rows = conn.execute(SELECT_FIRST_PAGE_SQL, (limit + 1,)).fetchall()
+            else:
+                rows = conn.execute(SELECT_NEXT_PAGE_SQL, (*position, limit + 1)).fetchall()
         
-        workouts = []
-        for row in cursor.fetchall():
-            workout = {
-                "exercise_name": row[0],
-                "sets": row[1],
-                "reps": row[2],
-                "weight": row[3],
-                "duration": row[4],
-                "date": row[5]
-            }
-            workouts.append(workout)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["date"], last["created_at"], last["id"])
         
-        conn.close()
-        return workouts
+        return [dict(row) for row in rows], next_cursor
     except Exception as e:
-        print(f"Error fetching workouts: {e}")
-        return []
+        print(f"Error fetching workouts page: {e}")
+        return [], None
+
+def get_recent_workouts(limit: int = 5, cursor: Optional[str] = None) -> List[Dict]:
+    """
+    Fetch the most recent workouts from the database.
+    
+    Args:
+        limit: Number of recent workouts to fetch (default: 5)
+        cursor: Optional cursor to continue from a previous page
+    
+    Returns:
+        List of workout dictionaries
+    """
+    workouts, _ = get_workouts_page(limit=limit, cursor=cursor)
+    return workouts
 
 def get_workouts_by_date_range(start_date: str, end_date: str) -> List[Dict]:
     """
@@ -124,34 +294,34 @@ def get_workouts_by_date_range(start_date: str, end_date: str) -> List[Dict]:
         List of workout dictionaries
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT exercise_name, sets, reps, weight, duration, date
-            FROM workouts
-            WHERE date BETWEEN ? AND ?
-            ORDER BY date DESC, created_at DESC
-        ''', (start_date, end_date))
-        
-        workouts = []
-        for row in cursor.fetchall():
-            workout = {
-                "exercise_name": row[0],
-                "sets": row[1],
-                "reps": row[2],
-                "weight": row[3],
-                "duration": row[4],
-                "date": row[5]
-            }
-            workouts.append(workout)
+        with _get_conn() as conn:
+            rows = conn.execute(SELECT_DATE_RANGE_SQL, (start_date, end_date)).fetchall()
         
-        conn.close()
-        return workouts
+        return [dict(row) for row in rows]
     except Exception as e:
         print(f"Error fetching workouts by date range: {e}")
         return []
 
+def get_weekly_summary(start_date: str, end_date: str) -> List[Dict]:
+    """
+    Aggregate workouts per week within a date range.
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+    
+    Returns:
+        List of weekly summaries (week, first_workout_date, workout_count, total_duration_minutes)
+    """
+    try:
+        with _get_conn() as conn:
+            rows = conn.execute(SELECT_WEEKLY_SUMMARY_SQL, (start_date, end_date)).fetchall()
+        
+        return [dict(row) for row in rows]
+    except Exception as e:
+        print(f"Error fetching weekly summary: {e}")
+        return []
+
 def get_all_workouts() -> List[Dict]:
     """
     Fetch all workouts from the database.
@@ -160,29 +330,39 @@ def get_all_workouts() -> List[Dict]:
         List of all workout dictionaries
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        with _get_conn() as conn:
+            rows = conn.execute(SELECT_ALL_SQL).fetchall()
         
-        cursor.execute('''
-            SELECT exercise_name, sets, reps, weight, duration, date
-            FROM workouts
-            ORDER BY date DESC, created_at DESC
-        ''')
-        
-        workouts = []
-        for row in cursor.fetchall():
-            workout = {
-                "exercise_name": row[0],
-                "sets": row[1],
-                "reps": row[2],
-                "weight": row[3],
-                "duration": row[4],
-                "date": row[5]
-            }
-            workouts.append(workout)
-        
-        conn.close()
-        return workouts
+        return [dict(row) for row in rows]
     except Exception as e:
         print(f"Error fetching all workouts: {e}")
         return []
+
+def get_workout_stats() -> Dict:
+    """
+    Compute workout statistics with a single SQL aggregate query.
+    
+    Returns:
+        Dictionary with total workouts, unique exercises, most recent date,
+        total duration and number of distinct workout days
+    """
+    try:
+        with _get_conn() as conn:
+            row = conn.execute(SELECT_STATS_SQL).fetchone()
+        
+        return {
+            "total_workouts": row[0],
+            "unique_exercises": row[1],
+            "most_recent_workout": row[2],
+            "total_duration_minutes": row[3],
+            "workout_days": row[4]
+        }
+    except Exception as e:
+        print(f"Error calculating workout stats: {e}")
+        return {
+            "total_workouts": 0,
+            "unique_exercises": 0,
+            "most_recent_workout": None,
+            "total_duration_minutes": 0,
+            "workout_days": 0
+        }
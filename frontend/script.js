@@ -233,15 +233,25 @@ async function loadWorkoutHistory() {
 async function loadAllWorkouts() {
     showLoading();
     try {
-        const response = await fetch(`${API_BASE_URL}/workouts/all`);
-        if (response.ok) {
-            const workouts = await response.json();
-            allWorkouts = workouts;
-            displayWorkoutHistory(workouts);
-            showToast(`Loaded ${workouts.length} workouts`, 'success');
-        } else {
-            showToast('Failed to load all workouts', 'error');
-        }
+        // Follow the X-Next-Cursor header until every page is loaded
+        const workouts = [];
+        let cursor = null;
+        do {
+            const url = cursor
+                ? `${API_BASE_URL}/workouts/all?cursor=${encodeURIComponent(cursor)}`
+                : `${API_BASE_URL}/workouts/all`;
+            const response = await fetch(url);
+            if (!response.ok) {
+                showToast('Failed to load all workouts', 'error');
+                return;
+            }
+            workouts.push(...await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
+        
+        allWorkouts = workouts;
+        displayWorkoutHistory(workouts);
+        showToast(`Loaded ${workouts.length} workouts`, 'success');
     } catch (error) {
         showToast('Failed to load all workouts', 'error');
         console.error('All workouts loading error:', error);
@@ -293,7 +303,7 @@ async function getWorkoutSuggestion() {
     showLoading();
     
     try {
-        const response = await fetch(`${API_BASE_URL}/get_suggestions`, {
+        const response = await fetch(`${API_BASE_URL}/get_suggestions/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -304,12 +314,45 @@ async function getWorkoutSuggestion() {
             })
         });
         
-        if (response.ok) {
-            const suggestion = await response.json();
-            displayWorkoutSuggestion(suggestion);
-        } else {
+        if (!response.ok) {
             const error = await response.json();
             showToast(`Failed to get suggestion: ${error.detail}`, 'error');
+            return;
+        }
+        
+        // Render tokens as they arrive instead of waiting for the full plan
+        hideLoading();
+        const suggestion = {
+            fitness_goal: fitnessGoal,
+            suggestion: '',
+            workout_history_count: 0,
+            generated_at: new Date().toISOString()
+        };
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            
+            for (const event of events) {
+                const dataLine = event.split('\n').find(line => line.startsWith('data: '));
+                if (!dataLine) continue;
+                
+                const payload = JSON.parse(dataLine.slice(6));
+                if (event.startsWith('event: done')) {
+                    Object.assign(suggestion, payload);
+                } else {
+                    suggestion.suggestion += payload.token;
+                }
+            }
+            
+            displayWorkoutSuggestion(suggestion);
         }
     } catch (error) {
         showToast('Failed to get workout suggestion', 'error');
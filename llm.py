@@ -4,17 +4,237 @@ Handles LLM chain creation and workout suggestion logic.
 """
 
 import os
-from typing import List, Dict
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple, AsyncIterator
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.runnables import Runnable
 from dotenv import load_dotenv
 import langchain
 
-from prompts import get_workout_prompt, WORKOUT_PLANNING_SYSTEM_PROMPT
+from prompts import (
+    get_workout_prompt,
+    get_goal_category,
+    WORKOUT_SUGGESTION_PROMPT,
+    STRENGTH_FOCUSED_PROMPT,
+    ENDURANCE_FOCUSED_PROMPT,
+    FAT_LOSS_FOCUSED_PROMPT,
+)
 from db import get_recent_workouts
 
 # Load environment variables
 load_dotenv()
 
+# Suggestion cache settings
+CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL", "3600"))
+EXACT_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+SEMANTIC_CACHE_DISTANCE = float(os.getenv("LLM_CACHE_DISTANCE", "0.1"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+class SuggestionCache:
+    """
+    Two-tier cache for generated workout suggestions.
+    Exact (goal, history) matches are served from an in-process LRU; near-duplicate
+    prompts fall through to a RedisVL semantic cache when REDIS_URL is configured
+    (install requirements-cache.txt for that tier). Semantic hits are restricted to
+    the same user and goal category.
+    """
+    
+    def __init__(self, ttl: int = CACHE_TTL_SECONDS,
+                 maxsize: int = EXACT_CACHE_SIZE,
+                 distance_threshold: float = SEMANTIC_CACHE_DISTANCE,
+                 redis_url: Optional[str] = REDIS_URL):
+        """
+        Initialize the suggestion cache.
+        
+        Args:
+            ttl: Time-to-live for cached suggestions in seconds
+            maxsize: Maximum number of entries kept in the exact-match tier
+            distance_threshold: Maximum vector distance for a semantic hit
+            redis_url: Redis connection URL (semantic tier is disabled if not set)
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.distance_threshold = distance_threshold
+        self._exact = OrderedDict()
+        self._lock = threading.Lock()
+        self._semantic = self._init_semantic_cache(redis_url) if redis_url else None
+    
+    def _init_semantic_cache(self, redis_url: str):
+        """
+        Create the RedisVL semantic cache, or return None if it is unavailable.
+        """
+        try:
+            from redisvl.extensions.cache.llm import SemanticCache
+            from redisvl.utils.vectorize import HFTextVectorizer
+            
+            return SemanticCache(
+                name="workout_suggestions",
+                redis_url=redis_url,
+                ttl=self.ttl,
+                distance_threshold=self.distance_threshold,
+                vectorizer=HFTextVectorizer("redis/langcache-embed-v1"),
+                filterable_fields=[
+                    {"name": "tenant", "type": "tag"},
+                    {"name": "goal", "type": "tag"}
+                ]
+            )
+        except Exception as e:
+            print(f"Semantic cache disabled: {e}")
+            return None
+    
+    @staticmethod
+    def tenant(user_id: Optional[str]) -> str:
+        """
+        Normalize a user ID to the tenant tag; a missing ID maps to "default"
+        so a tenant filter is never dropped from a semantic lookup.
+        """
+        return user_id or "default"
+    
+    @staticmethod
+    def make_key(fitness_goal: str, workout_history: str, user_id: Optional[str] = "default") -> str:
+        """
+        Build the exact-match cache key for a (goal, history) pair.
+        """
+        raw = f"{SuggestionCache.tenant(user_id)}\0{fitness_goal}\0{workout_history}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def make_prompt(fitness_goal: str, workout_history: str) -> str:
+        """
+        Build the text embedded for semantic lookups.
+        """
+        return f"{fitness_goal}\n{workout_history}"
+    
+    def _get_exact(self, key: str) -> Optional[str]:
+        """
+        Look up a suggestion in the in-process tier, evicting it if expired.
+        """
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._exact.move_to_end(key)
+                return response
+            del self._exact[key]
+            return None
+    
+    def _set_exact(self, key: str, response: str) -> None:
+        """
+        Store a suggestion in the in-process tier, evicting the least recently used entry.
+        """
+        with self._lock:
+            self._exact[key] = (time.monotonic() + self.ttl, response)
+            self._exact.move_to_end(key)
+            if len(self._exact) > self.maxsize:
+                self._exact.popitem(last=False)
+    
+    def get(self, fitness_goal: str, workout_history: str,
+            user_id: Optional[str] = "default") -> Optional[str]:
+        """
+        Look up a cached suggestion.
+        
+        Args:
+            fitness_goal: User's fitness goal
+            workout_history: Formatted workout history sent to the LLM
+            user_id: User identifier used to keep tenants apart
+        
+        Returns:
+            Cached suggestion, or None on a miss
+        """
+        key = self.make_key(fitness_goal, workout_history, user_id)
+        response = self._get_exact(key)
+        if response is not None or self._semantic is None:
+            return response
+        
+        try:
+            from redisvl.query.filter import Tag
+            
+            hits = self._semantic.check(
+                prompt=self.make_prompt(fitness_goal, workout_history),
+                num_results=1,
+                distance_threshold=self.distance_threshold,
+                filter_expression=(Tag("tenant") == self.tenant(user_id))
+                & (Tag("goal") == get_goal_category(fitness_goal))
+            )
+        except Exception as e:
+            print(f"Semantic cache lookup failed: {e}")
+            return None
+        
+        if not hits:
+            return None
+        
+        response = hits[0]["response"]
+        self._set_exact(key, response)
+        return response
+    
+    def set(self, fitness_goal: str, workout_history: str, response: str,
+            user_id: Optional[str] = "default") -> None:
+        """
+        Store a generated suggestion in both cache tiers.
+        
+        Args:
+            fitness_goal: User's fitness goal
+            workout_history: Formatted workout history sent to the LLM
+            response: Generated suggestion
+            user_id: User identifier used to keep tenants apart
+        """
+        key = self.make_key(fitness_goal, workout_history, user_id)
+        self._set_exact(key, response)
+        
+        if self._semantic is None:
+            return
+        
+        try:
+            self._semantic.store(
+                prompt=self.make_prompt(fitness_goal, workout_history),
+                response=response,
+                metadata={"goal": fitness_goal},
+                filters={"tenant": self.tenant(user_id), "goal": get_goal_category(fitness_goal)}
+            )
+        except Exception as e:
+            print(f"Semantic cache store failed: {e}")
+    
+    async def aget(self, fitness_goal: str, workout_history: str,
+                   user_id: Optional[str] = "default") -> Optional[str]:
+        """
+        Async variant of get() that keeps semantic lookups off the event loop.
+        """
+        key = self.make_key(fitness_goal, workout_history, user_id)
+        response = self._get_exact(key)
+        if response is not None or self._semantic is None:
+            return response
+        return await asyncio.to_thread(self.get, fitness_goal, workout_history, user_id)
+    
+    async def aset(self, fitness_goal: str, workout_history: str, response: str,
+                   user_id: Optional[str] = "default") -> None:
+        """
+        Async variant of set() that keeps semantic stores off the event loop.
+        """
+        if self._semantic is None:
+            self.set(fitness_goal, workout_history, response, user_id)
+        else:
+            await asyncio.to_thread(self.set, fitness_goal, workout_history, response, user_id)
+    
+    def clear(self) -> None:
+        """
+        Drop all cached suggestions.
+        """
+        with self._lock:
+            self._exact.clear()
+        if self._semantic is not None:
+            try:
+                self._semantic.clear()
+            except Exception as e:
+                print(f"Semantic cache clear failed: {e}")
+
 
 class WorkoutSuggestionChain:
     """
@@ -36,6 +256,34 @@ class WorkoutSuggestionChain:
         )
         self.model_name = model_name
         self.temperature = temperature
+        self.cache = SuggestionCache()
+        
+        # Build one chain per prompt template up front instead of per request
+        self._chains = {
+            id(template): template | self.llm
+            for template in (
+                WORKOUT_SUGGESTION_PROMPT,
+                STRENGTH_FOCUSED_PROMPT,
+                ENDURANCE_FOCUSED_PROMPT,
+                FAT_LOSS_FOCUSED_PROMPT,
+            )
+        }
+    
+    def get_chain(self, prompt_template):
+        """
+        Get the prebuilt chain for a prompt template.
+        
+        Args:
+            prompt_template: Prompt template returned by get_workout_prompt
+        
+        Returns:
+            Runnable chain combining the template and the LLM
+        """
+        chain = self._chains.get(id(prompt_template))
+        if chain is None:
+            # Templates outside prompts.py are composed on the fly
+            chain = prompt_template | self.llm
+        return chain
     
     def format_workout_history(self, workouts: List[Dict]) -> str:
         """
@@ -50,25 +298,45 @@ class WorkoutSuggestionChain:
         if not workouts:
             return "No previous workouts found."
         
-        formatted_workouts = []
-        for i, workout in enumerate(workouts, 1):
-            workout_str = f"Workout {i} ({workout['date']}):\n"
-            workout_str += f"  Exercise: {workout['exercise_name']}\n"
-            
-            if workout['sets']:
-                workout_str += f"  Sets: {workout['sets']}\n"
-            if workout['reps']:
-                workout_str += f"  Reps: {workout['reps']}\n"
-            if workout['weight']:
-                workout_str += f"  Weight: {workout['weight']} kg/lbs\n"
-            if workout['duration']:
-                workout_str += f"  Duration: {workout['duration']} minutes\n"
-            
-            formatted_workouts.append(workout_str)
+        return "\n".join(
+            f"Workout {i} ({workout['date']}):\n"
+            f"  Exercise: {workout['exercise_name']}\n"
+            + (f"  Sets: {workout['sets']}\n" if workout['sets'] else "")
+            + (f"  Reps: {workout['reps']}\n" if workout['reps'] else "")
+            + (f"  Weight: {workout['weight']} kg/lbs\n" if workout['weight'] else "")
+            + (f"  Duration: {workout['duration']} minutes\n" if workout['duration'] else "")
+            for i, workout in enumerate(workouts, 1)
+        )
+    
+    def _prepare(self, fitness_goal: str, workouts: List[Dict]) -> Tuple[str, Runnable, Dict[str, str]]:
+        """
+        Build everything a suggestion request needs from a goal and workout history.
         
-        return "\n".join(formatted_workouts)
+        Args:
+            fitness_goal: User's fitness goal
+            workouts: Workouts to use as history
+        
+        Returns:
+            Tuple of (formatted workout history, chain for the goal, chain input variables)
+        """
+        workout_history = self.format_workout_history(workouts)
+        chain = self.get_chain(get_workout_prompt(fitness_goal))
+        input_vars = {
+            "workout_history": workout_history,
+            "fitness_goal": fitness_goal,
+            "current_date": datetime.now().strftime("%Y-%m-%d")
+        }
+        return workout_history, chain, input_vars
+    
+    @staticmethod
+    def _error_message(e: Exception) -> str:
+        """
+        Log a generation failure and build the apology shown to the user.
+        """
+        print(f"Error generating workout suggestion: {str(e)}")
+        return f"I apologize, but I encountered an error while generating your workout suggestion. Please make sure your OpenAI API key is properly configured. Error: {str(e)}"
     
-    def generate_workout_suggestion(self, fitness_goal: str, user_id: str = "default") -> str:
+    async def generate_workout_suggestion(self, fitness_goal: str, user_id: str = "default") -> str:
         """
         Generate a personalized workout suggestion using LangChain.
         
@@ -80,40 +348,61 @@ class WorkoutSuggestionChain:
             Generated workout suggestion
         """
         try:
-            # Get recent workout history
-            recent_workouts = get_recent_workouts(limit=5)
-            workout_history = self.format_workout_history(recent_workouts)
+            recent_workouts = await asyncio.to_thread(get_recent_workouts, 5)
+            workout_history, chain, input_vars = self._prepare(fitness_goal, recent_workouts)
+            
+            # Serve repeated or near-duplicate requests from the cache
+            cached = await self.cache.aget(fitness_goal, workout_history, user_id)
+            if cached is not None:
+                return cached
             
-            # Get current date
-            from datetime import datetime
-            current_date = datetime.now().strftime("%Y-%m-%d")
+            response = await chain.ainvoke(input_vars)
             
-            # Get appropriate prompt template
-            prompt_template = get_workout_prompt(fitness_goal)
+            # Don't cache empty completions (e.g. safety blocks) for the whole TTL
+            if response.content:
+                await self.cache.aset(fitness_goal, workout_history, response.content, user_id)
+            return response.content
             
-            # Create the chain
-            llm=self.llm
+        except Exception as e:
+            return self._error_message(e)
+    
+    async def stream_workout_suggestion(self, fitness_goal: str,
+                                        user_id: str = "default") -> AsyncIterator[str]:
+        """
+        Stream a personalized workout suggestion as it is generated.
+        
+        Args:
+            fitness_goal: User's fitness goal (e.g., "strength", "endurance", "fat loss")
+            user_id: User identifier (for future multi-user support)
+        
+        Yields:
+            Chunks of the generated workout suggestion
+        """
+        try:
+            recent_workouts = await asyncio.to_thread(get_recent_workouts, 5)
+            workout_history, chain, input_vars = self._prepare(fitness_goal, recent_workouts)
             
-            # Prepare input variables
-            input_vars = {
-                "system_prompt": WORKOUT_PLANNING_SYSTEM_PROMPT,
-                "workout_history": workout_history,
-                "fitness_goal": fitness_goal,
-                "current_date": current_date
-            }
+            # Serve repeated or near-duplicate requests from the cache in one chunk
+            cached = await self.cache.aget(fitness_goal, workout_history, user_id)
+            if cached is not None:
+                yield cached
+                return
             
-            chain = prompt_template | llm
-            # Generate the suggestion
-            response = chain.invoke(input_vars)
+            # Stream the suggestion, keeping the full text for the cache
+            parts = []
+            async for chunk in chain.astream(input_vars):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
             
-            return response.content
+            # Don't cache empty completions (e.g. safety blocks) for the whole TTL
+            if parts:
+                await self.cache.aset(fitness_goal, workout_history, "".join(parts), user_id)
             
         except Exception as e:
-            error_msg = f"Error generating workout suggestion: {str(e)}"
-            print(error_msg)
-            return f"I apologize, but I encountered an error while generating your workout suggestion. Please make sure your OpenAI API key is properly configured. Error: {str(e)}"
+            yield self._error_message(e)
     
-    def generate_workout_suggestion_with_custom_history(self, 
+    async def generate_workout_suggestion_with_custom_history(self, 
                                                       fitness_goal: str, 
                                                       custom_workouts: List[Dict]) -> str:
         """
@@ -127,41 +416,17 @@ class WorkoutSuggestionChain:
             Generated workout suggestion
         """
         try:
-            # Format custom workout history
-            workout_history = self.format_workout_history(custom_workouts)
-            
-            # Get current date
-            from datetime import datetime
-            current_date = datetime.now().strftime("%Y-%m-%d")
-            
-            # Get appropriate prompt template
-            prompt_template = get_workout_prompt(fitness_goal)
-            
-            # Create the chain
-            llm=self.llm
-            
-            # Prepare input variables
-            input_vars = {
-                "system_prompt": WORKOUT_PLANNING_SYSTEM_PROMPT,
-                "workout_history": workout_history,
-                "fitness_goal": fitness_goal,
-                "current_date": current_date
-            }
-            
-            # Generate the suggestion
-            response = llm.invoke(prompt_template, input_vars)
-            
+            _, chain, input_vars = self._prepare(fitness_goal, custom_workouts)
+            response = await chain.ainvoke(input_vars)
             return response.content
             
         except Exception as e:
-            error_msg = f"Error generating workout suggestion: {str(e)}"
-            print(error_msg)
-            return f"I apologize, but I encountered an error while generating your workout suggestion. Please make sure your OpenAI API key is properly configured. Error: {str(e)}"
+            return self._error_message(e)
 
 # Global instance for easy access
 workout_chain = WorkoutSuggestionChain()
 
-def get_workout_suggestion(fitness_goal: str, user_id: str = "default") -> str:
+async def get_workout_suggestion(fitness_goal: str, user_id: str = "default") -> str:
     """
     Convenience function to get workout suggestions.
     
@@ -172,4 +437,18 @@ def get_workout_suggestion(fitness_goal: str, user_id: str = "default") -> str:
     Returns:
         Generated workout suggestion
     """
-    return workout_chain.generate_workout_suggestion(fitness_goal, user_id)
+    return await workout_chain.generate_workout_suggestion(fitness_goal, user_id)
+
+async def stream_workout_suggestion(fitness_goal: str, user_id: str = "default") -> AsyncIterator[str]:
+    """
+    Convenience function to stream workout suggestions.
+    
+    Args:
+        fitness_goal: User's fitness goal
+        user_id: User identifier
+    
+    Yields:
+        Chunks of the generated workout suggestion
+    """
+    async for chunk in workout_chain.stream_workout_suggestion(fitness_goal, user_id):
+        yield chunk
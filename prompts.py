@@ -3,6 +3,7 @@ Prompt templates for the LLM-powered workout planner.
 Contains modular prompt templates for different workout planning scenarios.
 """
 
+import re
 from langchain.prompts import PromptTemplate
 
 # System prompt for workout planning
@@ -27,6 +28,9 @@ Your suggestions should be:
 Format your response in a clear, structured way that's easy to follow.
 """
 
+# The system prompt is baked into each template at import time, so only the
+# dynamic fields are substituted per request and the prompt prefix stays identical
+
 # Main workout suggestion prompt template
 WORKOUT_SUGGESTION_PROMPT = PromptTemplate(
     input_variables=["workout_history", "fitness_goal", "current_date"],
@@ -56,7 +60,7 @@ Provide a structured workout plan with:
 5. Rest day recommendations if needed
 
 Keep the workout focused, achievable, and aligned with their goals.
-"""
+""".replace("{system_prompt}", WORKOUT_PLANNING_SYSTEM_PROMPT)
 )
 
 # Alternative prompt for strength-focused goals
@@ -84,7 +88,7 @@ Provide specific recommendations for:
 3. Set and rep schemes (typically 3-5 sets of 3-8 reps for strength)
 4. Weight progression suggestions
 5. Rest periods
-"""
+""".replace("{system_prompt}", WORKOUT_PLANNING_SYSTEM_PROMPT)
 )
 
 # Alternative prompt for endurance/cardio goals
@@ -112,7 +116,7 @@ Provide specific recommendations for:
 3. Duration and intensity levels
 4. Heart rate targets
 5. Active recovery periods
-"""
+""".replace("{system_prompt}", WORKOUT_PLANNING_SYSTEM_PROMPT)
 )
 
 # Alternative prompt for fat loss goals
@@ -140,9 +144,47 @@ Provide specific recommendations for:
 3. Circuit training format
 4. Work-to-rest ratios
 5. Total workout duration
-"""
+""".replace("{system_prompt}", WORKOUT_PLANNING_SYSTEM_PROMPT)
 )
 
+# Goal keyword routing table, in priority order
+_GOAL_TABLE = {
+    "strength": "strength",
+    "muscle": "strength",
+    "endurance": "endurance",
+    "cardio": "endurance",
+    "fat": "fat_loss",
+    "weight loss": "fat_loss",
+    "lose": "fat_loss",
+}
+_GOAL_PRIORITY = {keyword: i for i, keyword in enumerate(_GOAL_TABLE)}
+_GOAL_RE = re.compile("|".join(map(re.escape, _GOAL_TABLE)))
+
+_CATEGORY_PROMPTS = {
+    "strength": STRENGTH_FOCUSED_PROMPT,
+    "endurance": ENDURANCE_FOCUSED_PROMPT,
+    "fat_loss": FAT_LOSS_FOCUSED_PROMPT,
+    "general": WORKOUT_SUGGESTION_PROMPT,
+}
+
+def get_goal_category(fitness_goal: str) -> str:
+    """
+    Route a fitness goal to its prompt category.
+    
+    Args:
+        fitness_goal: The user's stated fitness goal
+    
+    Returns:
+        str: One of "strength", "endurance", "fat_loss" or "general"
+    """
+    matches = _GOAL_RE.findall(fitness_goal.lower())
+    
+    if not matches:
+        return "general"
+    
+    # Several keywords may appear; the highest-priority one wins
+    return _GOAL_TABLE[min(matches, key=_GOAL_PRIORITY.__getitem__)]
+
 # Function to get the appropriate prompt based on fitness goal
 def get_workout_prompt(fitness_goal: str) -> PromptTemplate:
     """
@@ -154,13 +196,4 @@ def get_workout_prompt(fitness_goal: str) -> PromptTemplate:
     Returns:
         PromptTemplate: The appropriate prompt template
     """
-    goal_lower = fitness_goal.lower()
-    
-    if "strength" in goal_lower or "muscle" in goal_lower:
-        return STRENGTH_FOCUSED_PROMPT
-    elif "endurance" in goal_lower or "cardio" in goal_lower:
-        return ENDURANCE_FOCUSED_PROMPT
-    elif "fat" in goal_lower or "weight loss" in goal_lower or "lose" in goal_lower:
-        return FAT_LOSS_FOCUSED_PROMPT
-    else:
-        return WORKOUT_SUGGESTION_PROMPT
+    return _CATEGORY_PROMPTS[get_goal_category(fitness_goal)]
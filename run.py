@@ -6,24 +6,45 @@ This script handles environment setup and starts the FastAPI server.
 
 import os
 import sys
-import subprocess
 from pathlib import Path
 
 def check_requirements():
     """Check if all required packages are installed."""
-    try:
-        import fastapi
-        import uvicorn
-        import langchain
-        import langchain_openai
-        import dotenv
-        import pydantic
-        print("✅ All required packages are installed")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing required package: {e}")
+    # Read package metadata only; importing LangChain just to probe it is slow
+    from importlib.metadata import version, PackageNotFoundError
+    
+    def find_missing(packages):
+        missing = []
+        for package in packages:
+            try:
+                version(package)
+            except PackageNotFoundError:
+                missing.append(package)
+        return missing
+    
+    # Keep in sync with requirements.txt
+    required = ["fastapi", "uvicorn", "httptools", "langchain", "langchain-google-genai",
+                "python-dotenv", "pydantic", "orjson"]
+    if sys.platform != "win32":
+        required.append("uvloop")
+    
+    missing = find_missing(required)
+    if missing:
+        print(f"❌ Missing required package(s): {', '.join(missing)}")
         print("Please install requirements: pip install -r requirements.txt")
         return False
+    
+    # The semantic cache is optional, but warn if it was configured without its packages
+    env_file = Path(".env")
+    env_lines = env_file.read_text().splitlines() if env_file.exists() else []
+    if os.getenv("REDIS_URL") or any(line.startswith("REDIS_URL=") for line in env_lines):
+        missing = find_missing(("redisvl", "sentence-transformers"))
+        if missing:
+            print(f"⚠️  REDIS_URL is set but {', '.join(missing)} is not installed; semantic cache disabled")
+            print("Install it with: pip install -r requirements-cache.txt")
+    
+    print("✅ All required packages are installed")
+    return True
 
 def check_env_file():
     """Check if .env file exists and has OpenAI API key."""
@@ -61,21 +82,31 @@ def main():
         print("3. Run this script again")
         sys.exit(1)
     
+    # Run 2 * cores + 1 workers so suggestion requests use every CPU.
+    # On Kubernetes set WORKERS=1 and scale pods instead. Each worker keeps its
+    # own SQLite connection pool, which is safe because the database runs in WAL mode.
+    workers = int(os.getenv("WORKERS") or 2 * (os.cpu_count() or 1) + 1)
+    
     print("\n🎯 Starting FastAPI server...")
+    print(f"👷 Workers: {workers}")
     print("📖 API Documentation: http://localhost:8000/docs")
     print("🔗 API Base URL: http://localhost:8000")
     print("⏹️  Press Ctrl+C to stop the server")
     print("=" * 50)
     
     try:
-        # Start the FastAPI server
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "app:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000", 
-            "--reload"
-        ])
+        # Start the FastAPI server in this interpreter
+        # (uvloop isn't available on Windows; fall back to asyncio there)
+        import uvicorn
+        from importlib.util import find_spec
+        uvicorn.run(
+            "app:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop" if find_spec("uvloop") else "auto",
+            http="httptools",
+            workers=workers
+        )
     except KeyboardInterrupt:
         print("\n👋 Server stopped. Goodbye!")
     except Exception as e:
@@ -3,146 +3,202 @@ Simple test script to demonstrate the workout tracker functionality.
 This script shows how to use the API endpoints programmatically.
 """
 
-import requests
-import json
-from datetime import datetime
+import httpx
+import asyncio
+import socket
+import orjson
+from typing import Dict, List, Tuple
 
 # Base URL for the API
 BASE_URL = "http://localhost:8000"
 
-def test_workout_tracker():
-    """Test the workout tracker functionality."""
+# Host and port probed before any HTTP request is made
+_BASE = httpx.URL(BASE_URL)
+SERVER_ADDRESS = (_BASE.host, _BASE.port or 80)
+
+# Endpoint URLs
+HEALTH_URL = f"{BASE_URL}/health"
+BULK_LOG_URL = f"{BASE_URL}/log_workouts_bulk"
+RECENT_URL = f"{BASE_URL}/workouts/recent?limit=3"
+STATS_URL = f"{BASE_URL}/workouts/stats"
+SUGG_URL = f"{BASE_URL}/get_suggestions"
+
+# Ask /workouts/recent for newline-delimited JSON so rows are parsed as they arrive
+NDJSON_HEADERS = {"Accept": "application/x-ndjson"}
+
+# Default request headers, set once on the client for every JSON body
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Template for the workout statistics lines, filled from the /workouts/stats response
+STATS_TMPL = (
+    "   - Total workouts: {total_workouts}\n"
+    "   - Unique exercises: {unique_exercises}\n"
+    "   - Most recent: {most_recent_workout}"
+)
+
+# Sample workouts logged by the script, serialized once at import
+SAMPLE_WORKOUTS = (
+    {
+        "exercise_name": "Bench Press",
+        "sets": 3,
+        "reps": 10,
+        "weight": 135.0,
+        "date": "2024-01-15"
+    },
+    {
+        "exercise_name": "Squats",
+        "sets": 4,
+        "reps": 12,
+        "weight": 185.0,
+        "date": "2024-01-16"
+    },
+    {
+        "exercise_name": "Deadlifts",
+        "sets": 3,
+        "reps": 8,
+        "weight": 225.0,
+        "date": "2024-01-17"
+    },
+    {
+        "exercise_name": "Pull-ups",
+        "sets": 3,
+        "reps": 8,
+        "weight": None,
+        "date": "2024-01-18"
+    },
+    {
+        "exercise_name": "Overhead Press",
+        "sets": 3,
+        "reps": 10,
+        "weight": 95.0,
+        "date": "2024-01-19"
+    }
+)
+SAMPLE_BODY = orjson.dumps(SAMPLE_WORKOUTS)
+SAMPLE_NAMES = tuple(workout["exercise_name"] for workout in SAMPLE_WORKOUTS)
+
+async def fetch_recent(client: httpx.AsyncClient) -> Tuple[httpx.Response, List[Dict]]:
+    """Stream recent workouts as NDJSON, decoding each line as it arrives."""
+    async with client.stream("GET", RECENT_URL, headers=NDJSON_HEADERS) as response:
+        workouts = []
+        if response.status_code == 200:
+            workouts = [orjson.loads(line) async for line in response.aiter_lines() if line]
+        else:
+            await response.aread()
+        return response, workouts
+
+async def suggest_one(client: httpx.AsyncClient, body: bytes) -> httpx.Response:
+    """Request a suggestion for one pre-serialized goal."""
+    return await client.post(SUGG_URL, content=body)
+
+def server_listening() -> bool:
+    """Check with a bare TCP connect whether anything is listening on the API port."""
+    try:
+        socket.create_connection(SERVER_ADDRESS, timeout=0.5).close()
+        return True
+    except OSError:
+        return False
+
+def ok(response: httpx.Response, label: str) -> bool:
+    """Print a pass/fail line for a response and return whether it succeeded."""
+    if response.status_code == 200:
+        print(f"✅ {label}")
+        return True
+    print(f"❌ {label} [{response.status_code}]")
+    return False
+
+async def run_workout_tracker():
+    """Exercise the workout tracker API end to end."""
     
     print("🏋️ Testing LLM-Powered Workout Tracker")
     print("=" * 50)
     
-    # Test 1: Health check
-    print("\n1. Testing health check...")
-    try:
-        response = requests.get(f"{BASE_URL}/health")
-        if response.status_code == 200:
-            print("✅ Health check passed")
-        else:
-            print("❌ Health check failed")
-    except requests.exceptions.ConnectionError:
+    # Fail fast when the server isn't running, before setting up an HTTP client
+    if not server_listening():
         print("❌ Cannot connect to API. Make sure the server is running on localhost:8000")
         return
     
-    # Test 2: Log some sample workouts
-    print("\n2. Logging sample workouts...")
-    sample_workouts = [
-        {
-            "exercise_name": "Bench Press",
-            "sets": 3,
-            "reps": 10,
-            "weight": 135.0,
-            "date": "2024-01-15"
-        },
-        {
-            "exercise_name": "Squats",
-            "sets": 4,
-            "reps": 12,
-            "weight": 185.0,
-            "date": "2024-01-16"
-        },
-        {
-            "exercise_name": "Deadlifts",
-            "sets": 3,
-            "reps": 8,
-            "weight": 225.0,
-            "date": "2024-01-17"
-        },
-        {
-            "exercise_name": "Pull-ups",
-            "sets": 3,
-            "reps": 8,
-            "weight": None,
-            "date": "2024-01-18"
-        },
-        {
-            "exercise_name": "Overhead Press",
-            "sets": 3,
-            "reps": 10,
-            "weight": 95.0,
-            "date": "2024-01-19"
-        }
-    ]
-    
-    for workout in sample_workouts:
+    # Multiplex every request over one connection when the server speaks HTTP/2
+    # (negotiated over TLS); plain-HTTP servers such as uvicorn fall back to HTTP/1.1
+    # keep-alive. Suggestions can take a while, so allow a generous read timeout.
+    async with httpx.AsyncClient(
+        http2=True,
+        headers=JSON_HEADERS,
+        limits=httpx.Limits(max_connections=8),
+        timeout=httpx.Timeout(120.0, connect=5.0)
+    ) as client:
         try:
-            response = requests.post(
-                f"{BASE_URL}/log_workout",
-                json=workout,
-                headers={"Content-Type": "application/json"}
+            # Test 1: Health check (sequential, everything else depends on it)
+            print("\n1. Testing health check...")
+            ok(await client.get(HEALTH_URL), "Health check")
+            
+            # Test 2: Log some sample workouts
+            print("\n2. Logging sample workouts...")
+            
+            # Send every workout in one request, logged in a single transaction
+            response = await client.post(BULK_LOG_URL, content=SAMPLE_BODY)
+            if ok(response, f"Logged {len(SAMPLE_WORKOUTS)} workouts"):
+                print("\n".join(f"   - {name}" for name in SAMPLE_NAMES))
+            
+            # Tests 3 and 4 are independent, so fetch them concurrently
+            (recent_response, workouts), stats_response = await asyncio.gather(
+                fetch_recent(client), client.get(STATS_URL)
             )
-            if response.status_code == 200:
-                print(f"✅ Logged: {workout['exercise_name']}")
-            else:
-                print(f"❌ Failed to log: {workout['exercise_name']}")
-        except Exception as e:
-            print(f"❌ Error logging {workout['exercise_name']}: {e}")
-    
-    # Test 3: Get recent workouts
-    print("\n3. Fetching recent workouts...")
-    try:
-        response = requests.get(f"{BASE_URL}/workouts/recent?limit=3")
-        if response.status_code == 200:
-            workouts = response.json()
-            print(f"✅ Retrieved {len(workouts)} recent workouts:")
-            for workout in workouts:
-                print(f"   - {workout['exercise_name']} ({workout['date']})")
-        else:
-            print("❌ Failed to fetch recent workouts")
-    except Exception as e:
-        print(f"❌ Error fetching workouts: {e}")
-    
-    # Test 4: Get workout statistics
-    print("\n4. Getting workout statistics...")
-    try:
-        response = requests.get(f"{BASE_URL}/workouts/stats")
-        if response.status_code == 200:
-            stats = response.json()
-            print("✅ Workout Statistics:")
-            print(f"   - Total workouts: {stats['total_workouts']}")
-            print(f"   - Unique exercises: {stats['unique_exercises']}")
-            print(f"   - Most recent: {stats['most_recent_workout']}")
-        else:
-            print("❌ Failed to fetch statistics")
-    except Exception as e:
-        print(f"❌ Error fetching stats: {e}")
-    
-    # Test 5: Get AI workout suggestions
-    print("\n5. Getting AI workout suggestions...")
-    fitness_goals = ["strength building", "endurance", "fat loss"]
-    
-    for goal in fitness_goals:
-        print(f"\n   Testing goal: {goal}")
-        try:
-            response = requests.post(
-                f"{BASE_URL}/get_suggestions",
-                json={"fitness_goal": goal},
-                headers={"Content-Type": "application/json"}
+            
+            # Test 3: Get recent workouts
+            print("\n3. Fetching recent workouts...")
+            if ok(recent_response, "Fetched recent workouts"):
+                # Build the listing once and write it with a single print
+                print("\n".join([
+                    f"   Retrieved {len(workouts)} recent workouts:",
+                    *(f"   - {w['exercise_name']} ({w['date']})" for w in workouts)
+                ]))
+            
+            # Test 4: Get workout statistics
+            print("\n4. Getting workout statistics...")
+            if ok(stats_response, "Workout Statistics:"):
+                print(STATS_TMPL.format_map(orjson.loads(stats_response.content)))
+            
+            # Test 5: Get AI workout suggestions
+            print("\n5. Getting AI workout suggestions...")
+            fitness_goals = ["strength building", "endurance", "fat loss"]
+            
+            # Serialize every body up front, then request all suggestions concurrently
+            goal_bodies = {goal: orjson.dumps({"fitness_goal": goal}) for goal in fitness_goals}
+            responses = await asyncio.gather(
+                *(suggest_one(client, goal_bodies[goal]) for goal in fitness_goals)
             )
-            if response.status_code == 200:
-                suggestion = response.json()
-                print(f"✅ Got suggestion for {goal}")
-                print(f"   Goal: {suggestion['fitness_goal']}")
-                print(f"   History count: {suggestion['workout_history_count']}")
-                print(f"   Generated at: {suggestion['generated_at']}")
-                print(f"   Suggestion preview: {suggestion['suggestion'][:100]}...")
-            else:
-                print(f"❌ Failed to get suggestion for {goal}")
-                print(f"   Status: {response.status_code}")
-                print(f"   Response: {response.text}")
+            for goal, response in zip(fitness_goals, responses):
+                print(f"\n   Testing goal: {goal}")
+                if ok(response, f"Got suggestion for {goal}"):
+                    suggestion = orjson.loads(response.content)
+                    print(
+                        f"   Goal: {suggestion['fitness_goal']}\n"
+                        f"   History count: {suggestion['workout_history_count']}\n"
+                        f"   Generated at: {suggestion['generated_at']}\n"
+                        f"   Suggestion preview: {suggestion['suggestion'][:100]}..."
+                    )
+                else:
+                    print(f"   Response: {response.text}")
+        
+        except httpx.ConnectError:
+            print("❌ Cannot connect to API. Make sure the server is running on localhost:8000")
+            return
         except Exception as e:
-            print(f"❌ Error getting suggestion for {goal}: {e}")
+            print(f"❌ Error: {e}")
     
-    print("\n" + "=" * 50)
-    print("🏁 Test completed!")
-    print("\nTo run the API server:")
-    print("python app.py")
-    print("\nTo view API documentation:")
-    print("http://localhost:8000/docs")
+    print("\n".join([
+        "\n" + "=" * 50,
+        "🏁 Test completed!",
+        "\nTo run the API server:",
+        "python app.py",
+        "\nTo view API documentation:",
+        "http://localhost:8000/docs"
+    ]))
+
+def test_workout_tracker():
+    """Test the workout tracker functionality."""
+    asyncio.run(run_workout_tracker())
 
 if __name__ == "__main__":
     test_workout_tracker()